@@ -1,27 +1,41 @@
 import dataclasses
+import functools
+import io
 import re
-import itertools
-import typing
+import time
+import threading
 import boto3
 import jinja2
-import json
+from markupsafe import Markup
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from operator import attrgetter
 
 # This file could be split into seperate model.py, view.py, and controller.py modules.
 
 #== helpers ==
 
+# Jump tables for DynamoDB's one-key type dicts: encoding dispatches on the Python
+# type and decoding on the type tag, so each value costs one dict lookup instead of a
+# chain of isinstance tests.
+_ENCODERS = {
+    str: lambda v: {"S": v},
+    bool: lambda v: {"BOOL": v},
+    list: lambda v: {"L": [dynamodb_encode_item(e) for e in v]},
+    dict: lambda v: {"M": { kk: dynamodb_encode_item(vv) for kk, vv in v.items()}},
+}
+
+_DECODERS = {
+    "L": lambda v: [dynamodb_decode_item(e) for e in v],
+    "M": lambda v: {k: dynamodb_decode_item(vv) for k, vv in v.items()},
+}
+
+
 def dynamodb_encode_item(v):
-    if isinstance(v, str):
-        return {"S": v}
-    elif isinstance(v, bool):
-        return {"BOOL": v}
-    elif isinstance(v, list):
-        return {"L": [dynamodb_encode_item(e) for e in v]}
-    elif isinstance(v, dict):
-        return {"M": { kk: dynamodb_encode_item(vv) for kk, vv in v.items()}}
-    else:
+    encoder = _ENCODERS.get(type(v))
+    if encoder is None:
         raise TypeError(f"Invalid type for encoding: {type(v).__name__}")
+    return encoder(v)
 
 def dynamodb_encode_dict(d: dict):
     new_dict = {}
@@ -35,12 +49,9 @@ def dynamodb_decode_item(d: dict):
         raise TypeError(f"Value of DynamoDB dict is not a nested dict.")
     if len(d) != 1:
         raise ValueError(f"Number of key-value pairs in DynamoDB dict is not one.")
-    item = list(d.values())[0]
-    if isinstance(item, list):
-        item = [dynamodb_decode_item(e) for e in item]
-    elif isinstance(item, dict):
-        item = {k: dynamodb_decode_item(v) for k, v in item.items()}
-    return item
+    (key, item), = d.items()
+    decoder = _DECODERS.get(key)
+    return decoder(item) if decoder is not None else item
 
 
 def dynamodb_decode_dict(d: dict):
@@ -52,8 +63,59 @@ def dynamodb_decode_dict(d: dict):
 
 # == MODEL ==
 
-
-@dataclasses.dataclass
+# Regex patterns for classifying primary keys. These are assembled and compiled once at
+# import time so classifying an entry doesn't pay f-string assembly and re-compilation
+# costs on every construction. The version patterns are anchored and built from flat
+# character classes (no nested quantified alternations), so a hostile primary key
+# cannot trigger superlinear backtracking; the semver tail is lazy so an old-style
+# trailing '.bd' marker is matched by its own group instead of being swallowed into
+# the version.
+_semver_re = r"(?:0|[1-9]\d*)\.(?:0|[1-9]\d*)\.(?:0|[1-9]\d*)(?:-[0-9A-Za-z.\-]+?)?(?:\+[0-9A-Za-z.\-]+?)?"
+_commit_hash_re = r"[0-9a-f]{7}"
+_resolution_re = r"2x25|2x2\.5|4x5|c?24|c?48|c?90|c?180"
+_simulation_re = fr"(?:gcc|gchp)-(?:(?:{_resolution_re})-)?(?:1Mon-|1Hr-)?(?:{_semver_re}|{_commit_hash_re})(?:\.bd)?"
+_simulation_tail_re = fr"-(?:(?:{_resolution_re})-)?(?:1Mon-|1Hr-)?(?:(?P<semver>{_semver_re})|(?P<commit_hash>{_commit_hash_re}))(?:\.bd)?$"
+# One pattern per model so the prefix dispatch below picks the narrower one and the
+# engine never walks the gcc/gchp alternation.
+_GCC_SIMULATION_RE = re.compile("^gcc" + _simulation_tail_re)
+_GCHP_SIMULATION_RE = re.compile("^gchp" + _simulation_tail_re)
+_DIFF_RE = re.compile(fr"^diff-{_simulation_re}-{_simulation_re}$")
+_DIFF_OF_DIFFS_RE = re.compile(fr"^diff-of-diffs-1Mon-(?:gcc|gchp)-(?:{_resolution_re})-(?:gcc|gchp)-(?:{_resolution_re})-(?:{_semver_re}|{_commit_hash_re})-(?:{_semver_re}|{_commit_hash_re})$")
+
+
+@functools.lru_cache(maxsize=2048)
+def _classify_primary_key(primary_key):
+    """Classify a primary key as (classification, api, code_url, commit_id).
+
+    A pure function of the key string, so it is memoized: the population of registry
+    keys is small and repeats across warm invocations, making a classification a dict
+    lookup after first sight of a key.
+    """
+    # Dispatch on the key prefix so a well-formed key runs exactly one anchored
+    # pattern and a key that cannot match runs none.
+    if primary_key is not None:
+        if primary_key.startswith("diff-"):
+            pattern = _DIFF_OF_DIFFS_RE if primary_key.startswith("diff-of-diffs-") else _DIFF_RE
+            if pattern.match(primary_key):
+                return ("Difference Plots", "difference", None, None)
+        elif primary_key.startswith(("gcc-", "gchp-")):
+            is_gchp = primary_key.startswith("gchp-")
+            pattern = _GCHP_SIMULATION_RE if is_gchp else _GCC_SIMULATION_RE
+            match = pattern.match(primary_key)
+            if match:
+                repo = "GCHP" if is_gchp else "GCClassic"
+                semver_tag = match.group("semver")
+                if semver_tag:
+                    commit_id = semver_tag
+                    code_url = f"https://github.com/geoschem/{repo}/tree/{commit_id}"
+                else:
+                    commit_id = match.group("commit_hash")
+                    code_url = f"https://github.com/geoschem/{repo}/commit/{commit_id}"
+                return ("GEOS-Chem Simulation", "simulation", code_url, commit_id)
+    return ("Unknown", None, None, None)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class PrimaryKeyClassification:
     classification: str = None
     api: str = None
@@ -62,40 +124,39 @@ class PrimaryKeyClassification:
     commit_id: str = None
 
     def __post_init__(self, primary_key):
-        semver_re = r"(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)(?:-((?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?(?:\+([0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?"
-        commit_hash_re = r"[0-9a-f]{7}"
-        simulation_re = fr"(gcc|gchp)-((2x25|2x2\.5|4x5|c?24|c?48|c?90|c?180)-)?(1Mon-|1Hr-)?({semver_re}|{commit_hash_re})(\.bd)?"
-        diff_of_diffs_re = fr"diff-of-diffs-1Mon-(gcc|gchp)-(2x25|2x2\.5|4x5|c?24|c?48|c?90|c?180)-(gcc|gchp)-(2x25|2x2\.5|4x5|c?24|c?48|c?90|c?180)-({semver_re}|{commit_hash_re})-({semver_re}|{commit_hash_re})"
-        if re.match(fr"^{simulation_re}$", primary_key):
-            if re.match(r"^gchp", primary_key):
-                self.classification = "GEOS-Chem Simulation"
-                repo = "GCHP"
-            else:
-                self.classification = "GEOS-Chem Simulation"
-                repo="GCClassic"
-            semver_tag = re.search(semver_re, primary_key)
-            if semver_tag:
-                self.commit_id = semver_tag.group(0)
-                self.commit_id = self.commit_id.removesuffix(".bd")  # for old entries
-                self.code_url = f"https://github.com/geoschem/{repo}/tree/{self.commit_id}"
-            commit_hash = re.search(commit_hash_re, primary_key)
-            if commit_hash:
-                self.commit_id = commit_hash.group(0)
-                self.commit_id = self.commit_id.removesuffix(".bd")  # for old entries
-                self.code_url = f"https://github.com/geoschem/{repo}/commit/{self.commit_id}"
-            self.api = "simulation"
-        elif re.match(fr"^diff-{simulation_re}-{simulation_re}$", primary_key):
-            self.classification = "Difference Plots"
-            self.api = "difference"
-        elif re.match(diff_of_diffs_re, primary_key):
-            self.classification = "Difference Plots"
-            self.api = "difference"
-        else:
-            self.classification = "Unknown"
-            self.api = None
-
-
-@dataclasses.dataclass
+        classification, api, code_url, commit_id = _classify_primary_key(primary_key)
+        # frozen=True blocks normal assignment, so fields are filled in the usual way
+        # for a frozen __post_init__.
+        object.__setattr__(self, "classification", classification)
+        object.__setattr__(self, "api", api)
+        object.__setattr__(self, "code_url", code_url)
+        object.__setattr__(self, "commit_id", commit_id)
+
+
+# Field tables mapping DynamoDB attribute names to dataclass attributes. Unpacking
+# items through these avoids deep-decoding attributes that are never read.
+_ENTRY_FIELDS = (
+    ("InstanceID", "primary_key"),
+    ("CreationDate", "creation_date"),
+    ("ExecStatus", "execution_status"),
+    ("Site", "execution_site"),
+    ("S3Uri", "s3_uri"),
+    ("Description", "description"),
+)
+
+_STAGE_FIELDS = (
+    ("Name", "name"),
+    ("Log", "log_file"),
+    ("Completed", "completed"),
+    ("StartTime", "start_time"),
+    ("EndTime", "end_time"),
+    ("Artifacts", "artifacts"),
+    ("PublicArtifacts", "public_artifacts"),
+    ("Metadata", "metadata"),
+)
+
+
+@dataclasses.dataclass(slots=True)
 class RegistryEntry:
     primary_key: str = None
     creation_date: str = None
@@ -103,63 +164,59 @@ class RegistryEntry:
     execution_site: str = None
     s3_uri: str = None
     description: str = None
-    primary_key_classification: PrimaryKeyClassification = None
-    dynamodb_scan_result: dataclasses.InitVar[dict] = None
-
-    def __post_init__(self, dynamodb_scan_result):
-        if dynamodb_scan_result is not None:
-            dynamodb_scan_result = dynamodb_decode_dict(dynamodb_scan_result)
-            self.primary_key = dynamodb_scan_result.get("InstanceID")
-            self.creation_date = dynamodb_scan_result.get("CreationDate")
-            self.execution_status = dynamodb_scan_result.get("ExecStatus")
-            self.execution_site = dynamodb_scan_result.get("Site")
-            self.s3_uri = dynamodb_scan_result.get("S3Uri")
-            self.description = dynamodb_scan_result.get("Description")
-        self.primary_key_classification = PrimaryKeyClassification(primary_key=self.primary_key)
-
-
-@dataclasses.dataclass
+
+    @classmethod
+    def from_item(cls, item):
+        # Flat construction; no __init__/__post_init__ chain to walk through.
+        entry = cls()
+        for key, attribute in _ENTRY_FIELDS:
+            value = item.get(key)
+            setattr(entry, attribute, value["S"] if value is not None else None)
+        return entry
+
+    @property
+    def primary_key_classification(self):
+        # Computed lazily: the simulation/difference pages never read the
+        # classification, so only the dashboard pays for it. The regex work behind
+        # this is memoized per key, so repeated reads cost a cache hit.
+        return PrimaryKeyClassification(primary_key=self.primary_key)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class RegistryEntryStage:
     name: str = None
     completed: bool = None
     log_file: str = None
     start_time: str = None
     end_time: str = None
-    artifacts: typing.List[str] = dataclasses.field(default_factory=list)
-    public_artifacts: typing.List[str] = dataclasses.field(default_factory=list)
+    artifacts: list[str] = dataclasses.field(default_factory=list)
+    public_artifacts: list[str] = dataclasses.field(default_factory=list)
     metadata: str = "{}"
-    dynamodb_stage_result: dataclasses.InitVar[dict] = None
-
-    def __post_init__(self, dynamodb_stage_result):
-        if dynamodb_stage_result is not None:
-            dynamodb_stage_result = dynamodb_decode_dict(dynamodb_stage_result)
-            self.name = dynamodb_stage_result.get("Name")
-            self.log_file = dynamodb_stage_result.get("Log")
-            self.completed = dynamodb_stage_result.get("Completed")
-            self.start_time = dynamodb_stage_result.get("StartTime")
-            self.end_time = dynamodb_stage_result.get("EndTime")
-            self.artifacts = dynamodb_stage_result.get("Artifacts")
-            self.public_artifacts = dynamodb_stage_result.get("PublicArtifacts")
-            self.metadata = dynamodb_stage_result.get("Metadata")
-
-
-@dataclasses.dataclass
+
+    @classmethod
+    def from_item(cls, item):
+        values = {}
+        for key, attribute in _STAGE_FIELDS:
+            value = item.get(key)
+            values[attribute] = dynamodb_decode_item(value) if value is not None else None
+        return cls(**values)
+
+
+@dataclasses.dataclass(slots=True)
 class RegistryEntrySimulation(RegistryEntry):
     setup_run_directory: RegistryEntryStage = None
     run_simulation_directory: RegistryEntryStage = None
-    dynamodb_query_result: dataclasses.InitVar[dict] = None
-
-    def __post_init__(self, dynamodb_scan_result, dynamodb_query_result):
-        if dynamodb_query_result is not None:
-            super().__post_init__(dynamodb_query_result)
-            stages = dynamodb_query_result["Stages"]["L"]
-            self.setup_run_directory = RegistryEntryStage(dynamodb_stage_result=stages[0].get("M", {}) if len(stages) >= 1 else {})
-            self.run_simulation_directory = RegistryEntryStage(dynamodb_stage_result=stages[1].get("M", {}) if len(stages) >= 2 else {})
-        else:
-            super().__post_init__(dynamodb_scan_result)
+
+    @classmethod
+    def from_item(cls, item):
+        entry = super(RegistryEntrySimulation, cls).from_item(item)
+        stages = item["Stages"]["L"]
+        entry.setup_run_directory = RegistryEntryStage.from_item(stages[0].get("M", {}) if len(stages) >= 1 else {})
+        entry.run_simulation_directory = RegistryEntryStage.from_item(stages[1].get("M", {}) if len(stages) >= 2 else {})
+        return entry
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class RegistryEntryDiff(RegistryEntry):
     run_gcpy_stage: RegistryEntryStage = None
     emissions_totals_link: str = None
@@ -167,18 +224,17 @@ class RegistryEntryDiff(RegistryEntry):
     global_mass_tropstrat_link: str = None
     inventory_totals_link: str = None
     oh_metrics_link: str = None
-    dynamodb_query_result: dataclasses.InitVar[dict] = None
 
-    def __post_init__(self, dynamodb_scan_result, dynamodb_query_result):
-        if dynamodb_query_result is not None:
-            super().__post_init__(dynamodb_query_result)
-            stages = dynamodb_query_result["Stages"]["L"]
-            self.run_gcpy_stage = RegistryEntryStage(dynamodb_stage_result=stages[0].get("M", {}) if len(stages) >= 1 else {})
-        else:
-            super().__post_init__(dynamodb_scan_result)
+    @classmethod
+    def from_item(cls, item):
+        entry = super(RegistryEntryDiff, cls).from_item(item)
+        # Stages[0] projections drop the attribute entirely when the list is empty.
+        stages = item.get("Stages", {}).get("L", [])
+        entry.run_gcpy_stage = RegistryEntryStage.from_item(stages[0].get("M", {}) if len(stages) >= 1 else {})
+        return entry
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class NewDifferencePlot:
     ref: str
     dev: str
@@ -241,8 +297,7 @@ dashboard_template="""
 <h2>Registered Simulations</h2>
 <table>
     <tr><th>Simulation ID</th><th>Date</th><th>Status</th><th>Code Url</th><th>Site</th><th>Description</th></tr>
-{%- for entry in entries -%}
-    {%- if entry.primary_key_classification.classification == 'GEOS-Chem Simulation' -%}
+{%- for entry in simulations -%}
     <tr>
         {%- if entry.primary_key_classification.api is not none -%}
         <td><a href="{{ entry.primary_key_classification.api }}?primary_key={{ entry.primary_key }}">{{ entry.primary_key }}</a></td>
@@ -250,12 +305,11 @@ dashboard_template="""
         <td>{{ entry.primary_key }}</td>
         {%- endif -%}
         <td>{{ entry.creation_date }}</td>
-        <td>{{ entry.execution_status }}</td>
+        <td>{{ entry.execution_status|status }}</td>
         <td><a href="{{ entry.primary_key_classification.code_url }}">{{ entry.primary_key_classification.commit_id }}</a></td>
         <td>{{ entry.execution_site }}</td>
         <td>{{ entry.description }}</td>
     </tr>
-    {%- endif -%}
 {%- endfor -%}
 </table>
 
@@ -263,8 +317,7 @@ dashboard_template="""
 <h2>Difference Plots</h2>
 <table>
     <tr><th>ID</th><th>Date</th><th>Status</th><th>Site</th><th>Description</th></tr>
-{%- for entry in entries -%}
-    {%- if entry.primary_key_classification.classification == 'Difference Plots' -%}
+{%- for entry in differences -%}
     <tr>
         {%- if entry.primary_key_classification.api is not none -%}
         <td><a href="{{ entry.primary_key_classification.api }}?primary_key={{ entry.primary_key }}">{{ entry.primary_key }}</a></td>
@@ -272,11 +325,10 @@ dashboard_template="""
         <td>{{ entry.primary_key }}</td>
         {%- endif -%}
         <td>{{ entry.creation_date }}</td>
-        <td>{{ entry.execution_status }}</td>
+        <td>{{ entry.execution_status|status }}</td>
         <td>{{ entry.execution_site }}</td>
         <td>{{ entry.description }}</td>
     </tr>
-    {%- endif -%}
 {%- endfor -%}
 </table>
 
@@ -284,72 +336,45 @@ dashboard_template="""
 <h2>Unclassified Entries</h2>
 <table>
     <tr><th>ID</th><th>Date</th><th>Status</th><th>Site</th><th>Description</th></tr>
-{%- for entry in entries -%}
-    {%- if entry.primary_key_classification.classification == 'Unknown' -%}
+{%- for entry in unclassified -%}
     <tr>
         <td>{{ entry.primary_key }}</td>
         <td>{{ entry.creation_date }}</td>
-        <td>{{ entry.execution_status }}</td>
+        <td>{{ entry.execution_status|status }}</td>
         <td>{{ entry.execution_site }}</td>
         <td>{{ entry.description }}</td>
     </tr>
-    {%- endif -%}
 {%- endfor -%}
 </table>
 """
 
-simulation_template="""
-<table>
-    <tr><th>Name</th><th>Value</th></tr>
-    <tr>
-        <td>Primary Key</td>
-        <td>{{ entry.primary_key }}</td>
-    </tr>
-    <tr>
-        <td>Creation Date</td>
-        <td>{{ entry.creation_date }}</td>
-    </tr>
-    <tr>
-        <td>Execution Status</td>
-        <td>{{ entry.execution_status }}</td>
-    </tr>
-    <tr>
-        <td>Execution Site</td>
-        <td>{{ entry.execution_site }}</td>
-    </tr>
-    <tr>
-        <td>S3 Uri Site</td>
-        <td>{{ entry.s3_uri }}</td>
-    </tr>
-    <tr>
-        <td>Description</td>
-        <td>{{ entry.description }}</td>
-    </tr>
-    <tr>
-        <td>Setup Run Directory</td>
-        {%- if entry.setup_run_directory is not none -%}
+# Shared stage-details cell, prepended to the templates that render stages so Jinja
+# compiles the block once instead of once per copy.
+stage_macro="""
+{%- macro stage(s) -%}
+        {%- if s is not none -%}
         <td>
             <table>
                 <tr>
                     <td>Completed</td>
-                    <td>{{ entry.setup_run_directory.completed }}</td>
+                    <td>{{ s.completed }}</td>
                 </tr>
                 <tr>
                     <td>Log File</td>
-                    <td><a href="{{ entry.setup_run_directory.log_file }}">{{ entry.setup_run_directory.log_file }}</a></td>
+                    <td><a href="{{ s.log_file }}">{{ s.log_file }}</a></td>
                 </tr>
                 <tr>
                     <td>Start Time</td>
-                    <td>{{ entry.setup_run_directory.start_time }}</td>
+                    <td>{{ s.start_time }}</td>
                 </tr>
                 <tr>
                     <td>End Time</td>
-                    <td>{{ entry.setup_run_directory.end_time }}</td>
+                    <td>{{ s.end_time }}</td>
                 </tr>
                 <tr>
                     <td>Public Artifacts</td>
                     <td>
-                    {%- for artifact in entry.setup_run_directory.public_artifacts -%}
+                    {%- for artifact in s.public_artifacts -%}
                         <a href="{{ artifact }}">{{ artifact }}</a><br>
                     {%- endfor -%}
                     </td>
@@ -357,67 +382,57 @@ simulation_template="""
                 <tr>
                     <td>Stage Artifacts</td>
                     <td>
-                    {%- for artifact in entry.setup_run_directory.artifacts -%}
+                    {%- for artifact in s.artifacts -%}
                         {{ artifact }}<br>
                     {%- endfor -%}
                     </td>
                 </tr>
                 <tr>
                     <td>Metadata</td>
-                    <td>{{ entry.setup_run_directory.metadata }}</td>
+                    <td>{{ s.metadata }}</td>
                 </tr>
             </table>
         </td>
         {%- else -%}
         <td>n/a</td>
         {%- endif -%}
-        
+{%- endmacro -%}
+"""
+
+simulation_template="""
+<table>
+    <tr><th>Name</th><th>Value</th></tr>
+    <tr>
+        <td>Primary Key</td>
+        <td>{{ entry.primary_key }}</td>
+    </tr>
+    <tr>
+        <td>Creation Date</td>
+        <td>{{ entry.creation_date }}</td>
+    </tr>
+    <tr>
+        <td>Execution Status</td>
+        <td>{{ entry.execution_status|status }}</td>
+    </tr>
+    <tr>
+        <td>Execution Site</td>
+        <td>{{ entry.execution_site }}</td>
+    </tr>
+    <tr>
+        <td>S3 Uri Site</td>
+        <td>{{ entry.s3_uri }}</td>
+    </tr>
+    <tr>
+        <td>Description</td>
+        <td>{{ entry.description }}</td>
+    </tr>
+    <tr>
+        <td>Setup Run Directory</td>
+        {{- stage(entry.setup_run_directory) -}}
+
         <tr>
         <td>Run Simulation</td>
-        {%- if entry.run_simulation_directory is not none -%}
-        <td>
-            <table>
-                <tr>
-                    <td>Completed</td>
-                    <td>{{ entry.run_simulation_directory.completed }}</td>
-                </tr>
-                <tr>
-                    <td>Log File</td>
-                    <td><a href="{{ entry.run_simulation_directory.log_file }}">{{ entry.run_simulation_directory.log_file }}</a></td>
-                </tr>
-                <tr>
-                    <td>Start Time</td>
-                    <td>{{ entry.run_simulation_directory.start_time }}</td>
-                </tr>
-                <tr>
-                    <td>End Time</td>
-                    <td>{{ entry.run_simulation_directory.end_time }}</td>
-                </tr>
-                <tr>
-                    <td>Public Artifacts</td>
-                    <td>
-                    {%- for artifact in entry.run_simulation_directory.public_artifacts -%}
-                        <a href="{{ artifact }}">{{ artifact }}</a><br>
-                    {%- endfor -%}
-                    </td>
-                </tr>
-                <tr>
-                    <td>Stage Artifacts</td>
-                    <td>
-                    {%- for artifact in entry.run_simulation_directory.artifacts -%}
-                        {{ artifact }}<br>
-                    {%- endfor -%}
-                    </td>
-                </tr>
-                <tr>
-                    <td>Metadata</td>
-                    <td>{{ entry.run_simulation_directory.metadata }}</td>
-                </tr>
-            </table>
-        </td>
-        {%- else -%}
-        <td>n/a</td>
-        {%- endif -%}
+        {{- stage(entry.run_simulation_directory) -}}
     </tr>
 </table>
 """
@@ -435,7 +450,7 @@ difference_template = """
     </tr>
     <tr>
         <td>Execution Status</td>
-        <td>{{ entry.execution_status }}</td>
+        <td>{{ entry.execution_status|status }}</td>
     </tr>
     <tr>
         <td>Execution Site</td>
@@ -451,138 +466,192 @@ difference_template = """
     </tr>
     <tr>
         <td>GCPy Output</td>
-        {%- if entry.run_gcpy_stage is not none -%}
-        <td>
-            <table>
-                <tr>
-                    <td>Completed</td>
-                    <td>{{ entry.run_gcpy_stage.completed }}</td>
-                </tr>
-                <tr>
-                    <td>Log File</td>
-                    <td><a href="{{ entry.run_gcpy_stage.log_file }}">{{ entry.run_gcpy_stage.log_file }}</a></td>
-                </tr>
-                <tr>
-                    <td>Start Time</td>
-                    <td>{{ entry.run_gcpy_stage.start_time }}</td>
-                </tr>
-                <tr>
-                    <td>End Time</td>
-                    <td>{{ entry.run_gcpy_stage.end_time }}</td>
-                </tr>
-                <tr>
-                    <td>Public Artifacts</td>
-                    <td>
-                    {%- for artifact in entry.run_gcpy_stage.public_artifacts -%}
-                        <a href="{{ artifact }}">{{ artifact }}</a><br>
-                    {%- endfor -%}
-                    </td>
-                </tr>
-                <tr>
-                    <td>Stage Artifacts</td>
-                    <td>
-                    {%- for artifact in entry.run_gcpy_stage.artifacts -%}
-                        {{ artifact }}<br>
-                    {%- endfor -%}
-                    </td>
-                </tr>
-                <tr>
-                    <td>Metadata</td>
-                    <td>{{ entry.run_gcpy_stage.metadata }}</td>
-                </tr>
-            </table>
-        </td>
-        {%- else -%}
-        <td>n/a</td>
-        {%- endif -%}
+        {{- stage(entry.run_gcpy_stage) -}}
     </tr>
 </table>
 """
 
 
-def fill_template(template_str, **kwargs):
-    env = jinja2.Environment()
-    html_page = html_page_begin + env.from_string(template_str).render(**kwargs) + html_page_end
-    html_page = html_page.replace("SUCCESSFUL", '<span style="color:green">✅ SUCCESSFUL</span>')
-    html_page = html_page.replace("IN_PROGRESS", '<span style="color:orange">⌛ IN_PROGRESS</span>')
-    html_page = html_page.replace("FAILED", '<span style="color:red">❌ FAILED</span>')
-    return html_page
+# The environment and templates are compiled once at import time so warm Lambda
+# invocations skip Jinja's lex/parse/codegen entirely. trim_blocks/lstrip_blocks keep
+# the compiled templates from emitting whitespace-only tokens around block tags, and
+# autoescape protects against markup smuggled into registry strings.
+_ENV = jinja2.Environment(trim_blocks=True, lstrip_blocks=True,
+                          autoescape=jinja2.select_autoescape(['html']))
+
+# Execution statuses are decorated per-cell by a filter rather than by scanning the
+# whole rendered page with str.replace. The spans are Markup so autoescape passes
+# them through; unknown statuses stay plain strings and get escaped normally.
+_STATUS_HTML = {
+    "SUCCESSFUL": Markup('<span style="color:green">✅ SUCCESSFUL</span>'),
+    "IN_PROGRESS": Markup('<span style="color:orange">⌛ IN_PROGRESS</span>'),
+    "FAILED": Markup('<span style="color:red">❌ FAILED</span>'),
+}
+_ENV.filters["status"] = lambda s: _STATUS_HTML.get(s, s)
+
+_DASHBOARD_TEMPLATE = _ENV.from_string(dashboard_template)
+_SIMULATION_TEMPLATE = _ENV.from_string(stage_macro + simulation_template)
+_DIFFERENCE_TEMPLATE = _ENV.from_string(stage_macro + difference_template)
+
+
+def fill_template(template, **kwargs):
+    # Streaming into one buffer writes the page shell and body without building
+    # intermediate full-page strings.
+    buffer = io.StringIO()
+    buffer.write(html_page_begin)
+    template.stream(**kwargs).dump(buffer)
+    buffer.write(html_page_end)
+    return buffer.getvalue()
 
 
 def get_dashboard_page(sorted_entries):
-    return fill_template(dashboard_template, entries=sorted_entries)
+    # Bucket the entries in one pass so the template doesn't filter the full list
+    # once per section.
+    buckets = {"GEOS-Chem Simulation": [], "Difference Plots": [], "Unknown": []}
+    for entry in sorted_entries:
+        buckets[entry.primary_key_classification.classification].append(entry)
+    return fill_template(
+        _DASHBOARD_TEMPLATE,
+        simulations=buckets["GEOS-Chem Simulation"],
+        differences=buckets["Difference Plots"],
+        unclassified=buckets["Unknown"],
+    )
 
 
 def get_simulation_page(entry):
-    return fill_template(simulation_template, entry=entry)
+    return fill_template(_SIMULATION_TEMPLATE, entry=entry)
 
 
 def get_difference_page(entry):
-    return fill_template(difference_template, entry=entry)
+    return fill_template(_DIFFERENCE_TEMPLATE, entry=entry)
 
 
 #== CONTROLLER ==
 TABLE_NAME="geoschem_testing"
 
+# The assumed-role client is cached at module scope so warm Lambda invocations reuse
+# it instead of calling STS every request. It is rebuilt once its credentials are
+# within a minute of expiring.
+_ASSUME_ROLE_DURATION = 900
+_dynamodb_client = None
+_dynamodb_client_expires_at = 0
+
 def get_dynamodb_client():
+    global _dynamodb_client, _dynamodb_client_expires_at
+    if _dynamodb_client is not None and time.time() < _dynamodb_client_expires_at - 60:
+        return _dynamodb_client
     role_arn = "arn:aws:iam::753979222379:role/washu_cross_account_role"
     client = boto3.client('sts')
     response = client.assume_role(RoleArn=role_arn,
                                   RoleSessionName='RoleSessionName',
-                                  DurationSeconds=900)
-    dynamodb_client = boto3.client('dynamodb', region_name='us-east-1',
-                                   aws_access_key_id=response['Credentials']['AccessKeyId'],
-                                   aws_secret_access_key=response['Credentials']['SecretAccessKey'],
-                                   aws_session_token=response['Credentials']['SessionToken'])
-    return dynamodb_client
+                                  DurationSeconds=_ASSUME_ROLE_DURATION)
+    _dynamodb_client = boto3.client('dynamodb', region_name='us-east-1',
+                                    aws_access_key_id=response['Credentials']['AccessKeyId'],
+                                    aws_secret_access_key=response['Credentials']['SecretAccessKey'],
+                                    aws_session_token=response['Credentials']['SessionToken'])
+    _dynamodb_client_expires_at = time.time() + _ASSUME_ROLE_DURATION
+    return _dynamodb_client
+
+def _prefetch_dynamodb_client():
+    try:
+        get_dynamodb_client()
+    except Exception:
+        pass  # couldn't assume the role at init time; the first request retries
+
+
+# Warm the assumed-role client cache during Lambda init so the first request doesn't
+# block on the STS round-trip.
+threading.Thread(target=_prefetch_dynamodb_client, daemon=True).start()
+
+
+_wustl_dynamodb_client = None
 
 def get_wustl_dynamodb_client():
-    return boto3.client('dynamodb')
+    # Lambda-role credentials don't expire like the assumed-role ones, so this client
+    # is cached indefinitely. Built lazily rather than at import so a missing default
+    # region only fails callers that actually use it.
+    global _wustl_dynamodb_client
+    if _wustl_dynamodb_client is None:
+        _wustl_dynamodb_client = boto3.client('dynamodb')
+    return _wustl_dynamodb_client
 
 
 def parse_scan_response(response):
     entries = []
     for item in response:
-        entries.append(RegistryEntry(dynamodb_scan_result=item))
+        entries.append(RegistryEntry.from_item(item))
     return entries
 
 
-def scan_registry():
-    client = get_dynamodb_client()
+# Number of segments the registry scan is split into; DynamoDB serves the segments
+# from separate partitions concurrently.
+_SCAN_SEGMENTS = 4
+
+
+def _scan_segment(client, segment):
     response = client.scan(
         TableName=TABLE_NAME,
         ProjectionExpression='InstanceID,CreationDate,ExecStatus,Site,Description',
+        Segment=segment,
+        TotalSegments=_SCAN_SEGMENTS,
     )
-    return parse_scan_response(response['Items'])
+    return response['Items']
+
+
+def scan_registry():
+    client = get_dynamodb_client()
+    items = []
+    with ThreadPoolExecutor(max_workers=_SCAN_SEGMENTS) as executor:
+        for segment_items in executor.map(lambda segment: _scan_segment(client, segment), range(_SCAN_SEGMENTS)):
+            items.extend(segment_items)
+    return parse_scan_response(items)
 
 
 def parse_query_response_astype(query_results, astype):
     entries = []
     for item in query_results:
-        entries.append(astype(dynamodb_query_result=item))
+        entries.append(astype.from_item(item))
     return entries
 
 
+# The entry dataclasses only ever read these attributes, so projecting them keeps
+# query response payloads and botocore's response parsing small. RegistryEntryDiff
+# only renders the first stage, so its projection trims the rest of the Stages list.
+_QUERY_PROJECTION = 'InstanceID,CreationDate,ExecStatus,Site,S3Uri,Description,Stages'
+_QUERY_PROJECTIONS = {
+    RegistryEntryDiff: 'InstanceID,CreationDate,ExecStatus,Site,S3Uri,Description,Stages[0]',
+}
+
+
 def query_registry(items, astype):
     client = get_dynamodb_client()
 
     if isinstance(items, str):
-        request_keys = [{"InstanceID": {"S": items}}]
+        # A single key goes through GetItem: fewer bytes on the wire and a flatter
+        # response shape than a one-element BatchGetItem.
+        request = {'TableName': TABLE_NAME, 'Key': {"InstanceID": {"S": items}}}
+        if astype is not dict:
+            request['ProjectionExpression'] = _QUERY_PROJECTIONS.get(astype, _QUERY_PROJECTION)
+        response = client.get_item(**request)
+        query_results = [response["Item"]] if "Item" in response else []
     else:
-        request_keys = [{"InstanceID": {"S": item.primary_key}} for item in items]
-    response = client.batch_get_item(
-        RequestItems={TABLE_NAME: {'Keys': request_keys}}
-    )
+        request = {'Keys': [{"InstanceID": {"S": item.primary_key}} for item in items]}
+        if astype is not dict:
+            request['ProjectionExpression'] = _QUERY_PROJECTIONS.get(astype, _QUERY_PROJECTION)
+        response = client.batch_get_item(
+            RequestItems={TABLE_NAME: request}
+        )
+        query_results = response["Responses"][TABLE_NAME]
 
     if astype is dict:
-        return [dynamodb_decode_dict(response) for response in response["Responses"][TABLE_NAME]]
+        return [dynamodb_decode_dict(item) for item in query_results]
     else:
-        return parse_query_response_astype(response["Responses"][TABLE_NAME], astype)
+        return parse_query_response_astype(query_results, astype)
 
 
 def dashboard(event, context):
     entries = scan_registry()
-    entries.sort(key=lambda entry: entry.creation_date, reverse=True)
+    entries.sort(key=attrgetter('creation_date'), reverse=True)
     html_page = get_dashboard_page(entries)
     return {
         "statusCode": 200,
@@ -44,6 +44,9 @@ def test_primary_key_classification():
     assert PrimaryKeyClassification(primary_key="gcc-1Hr-483b659").classification == "GEOS-Chem Simulation"
     assert PrimaryKeyClassification(primary_key="gcc-4x5-1Hr-483b659").classification == "GEOS-Chem Simulation"
     assert PrimaryKeyClassification(primary_key="diff-of-diffs-1Mon-gchp-c24-gcc-c24-13.4.0-alpha.26-13.4.0-alpha.27").classification == "Difference Plots"
+    assert PrimaryKeyClassification(primary_key="gchp-1Mon-13.4.0-rc.3.bd").commit_id == "13.4.0-rc.3"
+    assert PrimaryKeyClassification(primary_key="gcc-1Hr-483b659.bd").commit_id == "483b659"
+    assert PrimaryKeyClassification(primary_key="not-a-registry-key").classification == "Unknown"
 
 
 def test_parsing_scan():
@@ -182,6 +185,15 @@ def test_parsing_diff_of_diffs_query():
     assert entries[0] == an_entry_that_should_exist
 
 
+def test_dashboard_page_status_coloring():
+    with open("test_data/scan_results.json") as f:
+        response = json.load(f)['Items']
+    entries = parse_scan_response(response)
+    html_page = get_dashboard_page(entries)
+    assert '<span style="color:red">❌ FAILED</span>' in html_page
+    assert '<span style="color:green">✅ SUCCESSFUL</span>' in html_page
+
+
 def test_diff_plot_get_put_item():
     new_request = NewDifferencePlot("1234-1Hr-1234", "abcd-1Hr-abcd", "AWS")
     answer = {